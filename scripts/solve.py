@@ -2,26 +2,26 @@ from __future__ import print_function
 
 import argparse
 import logging
+import multiprocessing
 import sys
+import traceback
+
+from six.moves import StringIO
 
 from simplesat.dependency_solver import DependencySolver
 from simplesat.pool import Pool
-from simplesat.sat.policy import InstalledFirstPolicy
 from simplesat.test_utils import Scenario
 from simplesat.errors import SatisfiabilityError
 
 
 def solve_and_print(request, remote_repositories, installed_repository,
-                    print_ids, prune=True, prefer_installed=True, debug=0,
-                    simple=False, strict=False):
+                    print_ids, prune=True, simple=False, strict=False):
     pool = Pool(remote_repositories)
     pool.add_repository(installed_repository)
 
-    policy = InstalledFirstPolicy(pool, installed_repository,
-                                  prefer_installed=prefer_installed)
     solver = DependencySolver(
         pool, remote_repositories, installed_repository,
-        policy=policy, use_pruning=prune, strict=strict)
+        use_pruning=prune, strict=strict)
 
     fmt = "ELAPSED : {description:20} : {elapsed:e}"
     try:
@@ -35,25 +35,81 @@ def solve_and_print(request, remote_repositories, installed_repository,
         print(msg.format(e.unsat.to_string(pool)))
         print(e.unsat._find_requirement_time.pretty(fmt), file=sys.stderr)
 
-    if debug:
-        counts, hist = solver._policy._log_histogram()
-        print(hist, file=sys.stderr)
-        report = solver._policy._log_report(with_assignments=debug > 1)
-        print(report, file=sys.stderr)
     print(solver._last_rules_time.pretty(fmt), file=sys.stderr)
     print(solver._last_solver_init_time.pretty(fmt), file=sys.stderr)
     print(solver._last_solve_time.pretty(fmt), file=sys.stderr)
 
 
+def solve_scenario(path, **kwargs):
+    """ Solve the scenario stored at `path` with :func:`solve_and_print`. """
+    scenario = Scenario.from_yaml(path)
+    solve_and_print(scenario.request, scenario.remote_repositories,
+                    scenario.installed_repository, **kwargs)
+
+
+def _solve_scenario_captured(args):
+    """ Run :func:`solve_scenario` and return what it printed or logged to
+    stdout and stderr, so that the output of scenarios solved in parallel
+    does not interleave.
+
+    An exception raised while solving is reported in the captured stderr
+    rather than raised, so that it does not discard the other scenarios.
+    """
+    path, kwargs = args
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = StringIO(), StringIO()
+
+    # The logging handlers hold on to the real stderr, so log records are
+    # sent to the captured stream as well.
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    handler = logging.StreamHandler(sys.stderr)
+    if handlers:
+        handler.setFormatter(handlers[0].formatter)
+    root_logger.handlers = [handler]
+    try:
+        try:
+            solve_scenario(path, **kwargs)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+        return sys.stdout.getvalue(), sys.stderr.getvalue()
+    finally:
+        root_logger.handlers = handlers
+        sys.stdout, sys.stderr = stdout, stderr
+
+
+def solve_scenarios(paths, processes=1, **kwargs):
+    """ Solve every scenario in `paths`, using up to `processes` worker
+    processes, and print the results in the order of `paths`.
+    """
+    jobs = [(path, kwargs) for path in paths]
+    if processes > 1:
+        # Solving is CPU bound, so use processes rather than threads.
+        workers = multiprocessing.Pool(processes)
+        try:
+            results = workers.map(_solve_scenario_captured, jobs)
+        finally:
+            workers.close()
+            workers.join()
+    else:
+        results = map(_solve_scenario_captured, jobs)
+
+    for path, (out, err) in zip(paths, results):
+        print("==> {0} <==".format(path))
+        sys.stdout.write(out)
+        sys.stderr.write(err)
+
+
 def main(argv=None):
     argv = argv or sys.argv[1:]
 
     p = argparse.ArgumentParser()
-    p.add_argument("scenario", help="Path to the YAML scenario file.")
+    p.add_argument("scenarios", nargs="+", metavar="scenario",
+                   help="Path to a YAML scenario file.")
+    p.add_argument("-j", "--parallel", type=int, default=1,
+                   help="Number of scenarios to solve in parallel.")
     p.add_argument("--print-ids", action="store_true")
     p.add_argument("--no-prune", dest="prune", action="store_false")
-    p.add_argument("--no-prefer-installed", dest="prefer_installed",
-                   action="store_false")
     p.add_argument("-d", "--debug", default=0, action="count")
     p.add_argument("--simple", action="store_true",
                    help="Show a simpler description of the transaction.")
@@ -68,11 +124,12 @@ def main(argv=None):
         datefmt='%Y-%m-%d %H:%M:%S',
         level=('INFO', 'WARNING', 'DEBUG')[ns.debug])
 
-    scenario = Scenario.from_yaml(ns.scenario)
-    solve_and_print(scenario.request, scenario.remote_repositories,
-                    scenario.installed_repository, ns.print_ids,
-                    prune=ns.prune, prefer_installed=ns.prefer_installed,
-                    debug=ns.debug, simple=ns.simple, strict=ns.strict)
+    options = dict(print_ids=ns.print_ids, prune=ns.prune,
+                   simple=ns.simple, strict=ns.strict)
+    if len(ns.scenarios) == 1:
+        solve_scenario(ns.scenarios[0], **options)
+    else:
+        solve_scenarios(ns.scenarios, processes=ns.parallel, **options)
 
 
 if __name__ == '__main__':
@@ -1,10 +1,7 @@
-from collections import defaultdict
-
-import six
-
 from simplesat import InstallRequirement, Pool
-from simplesat.utils.graph import (package_lit_dependency_graph,
-                                   transitive_neighbors)
+from simplesat.utils.graph import (
+    connected_nodes, package_lit_dependency_graph, reverse_graph
+)
 
 
 def compute_dependencies(repositories, requirement, transitive=False):
@@ -26,8 +23,11 @@ def compute_dependencies(repositories, requirement, transitive=False):
         the given requirement depend on.
     """
     pool = Pool(repositories)
-    neighbors = _neighbors_in_repositories(pool, transitive)
-    dependencies = _neighbors_for_requirement(pool, neighbors, requirement)
+    # Only the packages reachable from `requirement` are ever looked at, so
+    # compute their dependencies on demand rather than for the whole pool.
+    neighbors = _LazyDependencyGraph(pool)
+    dependencies = _neighbors_for_requirement(pool, neighbors, requirement,
+                                              transitive)
     return dependencies
 
 
@@ -50,9 +50,9 @@ def compute_reverse_dependencies(repositories, requirement, transitive=False):
         packages satisfying the given requirement.
     """
     pool = Pool(repositories)
-    reverse_neighbors = _reverse_neighbors_in_repositories(pool, transitive)
+    reverse_neighbors = _reverse_dependency_graph(pool)
     dependencies = _neighbors_for_requirement(pool, reverse_neighbors,
-                                              requirement)
+                                              requirement, transitive)
     return dependencies
 
 
@@ -70,7 +70,7 @@ def compute_leaf_packages(repositories):
         Set of leaf packages in the given repositories.
     """
     pool = Pool(repositories)
-    reverse_neighbors = _reverse_neighbors_in_repositories(pool)
+    reverse_neighbors = _reverse_dependency_graph(pool)
 
     leaf_packages = set()
     for package in pool.iter_packages():
@@ -84,71 +84,33 @@ def compute_leaf_packages(repositories):
     return leaf_packages
 
 
-def _neighbors_in_repositories(pool, transitive=False):
-    """ Compute neighboring packages for all packages in a pool of
-    repositories.
-
-    Parameters
-    ----------------
-    pool: Pool
-    transitive : bool
-        If True, recursively walk up the dependency graph. If False (default),
-        only returns the packages on which the package directly depends.
-
-    Returns
-    -----------
-    neighbors : dict
-         dict of all packages mapped to their neighbors.
+class _LazyDependencyGraph(dict):
+    """ Mapping from package ids in `pool` to the ids of the packages they
+    directly depend on, computed as ids are looked up.
     """
-    package_ids = set(pool.iter_package_ids())
-    neighbors = _compute_dependency_dict(pool, package_ids, transitive)
-    return neighbors
-
-
-def _reverse_neighbors_in_repositories(pool, transitive=False):
-    """ Compute Reverse mapping of packages in a pool of repositories such that
-    package ids point to the packages which depend on them.
-
-    Parameters
-    ----------------
-    pool: Pool
-    transitive : bool
-        If True, recursively walk up the dependency graph. If False (default),
-        only returns the packages on which the package directly depends.
 
-    Returns
-    -----------
-    reverse_neighbors : dict
-         dict of all packages mapped to packages that depend on them.
-    """
-    neighbors = _neighbors_in_repositories(pool, transitive)
-    reverse_neighbors = _reverse_mapping(neighbors)
-    return reverse_neighbors
+    def __init__(self, pool):
+        super(_LazyDependencyGraph, self).__init__()
+        self._pool = pool
 
+    def __missing__(self, package_id):
+        graph = package_lit_dependency_graph(
+            self._pool, [package_id], closed=False)
+        neighbor_ids = self[package_id] = graph[package_id]
+        return neighbor_ids
 
-def _compute_dependency_dict(pool, package_ids, transitive=False):
-    """ Return mapping of package ids to their dependent package ids.
 
-    If transitive is False, a package id will point to only its immediate
-    dependencies. Otherwise, the mapping will include all recursive
-    dependencies.
+def _reverse_dependency_graph(pool):
+    """ Mapping from each package id in `pool` to the ids of the packages
+    which directly depend on it.
     """
-    graph = package_lit_dependency_graph(pool, package_ids, closed=False)
-    if transitive:
-        return transitive_neighbors(graph)
-    return graph
-
-
-def _reverse_mapping(mapping):
-    reversed_map = defaultdict(set)
-    for key, vals in six.iteritems(mapping):
-        for v in vals:
-            reversed_map[v].add(key)
+    graph = package_lit_dependency_graph(
+        pool, pool.iter_package_ids(), closed=False)
+    return reverse_graph(graph)
 
-    return reversed_map
 
-
-def _neighbors_for_requirement(pool, neighbor_mapping, requirement):
+def _neighbors_for_requirement(pool, neighbor_mapping, requirement,
+                               transitive=False):
     """ Compute neighboring packages for all packages satisfying `requirement`
 
     Parameters
@@ -161,6 +123,10 @@ def _neighbors_for_requirement(pool, neighbor_mapping, requirement):
     requirement : Requirement
         The package requirement for which to look up neighbors. All packages
         which satisfy the requirement will be used.
+    transitive : bool
+        If True, also include the neighbors of neighbors, recursively. Only
+        the packages reachable from those satisfying `requirement` are
+        visited.
 
     Returns
     -----------
@@ -168,12 +134,19 @@ def _neighbors_for_requirement(pool, neighbor_mapping, requirement):
          Set of packages in the pool that are neighbors of packages which
          satisfy `requirement`.
     """
-    neighbors = set()
+    neighbor_ids = set()
     for package_id in _package_ids_satisfying_requirement(pool, requirement):
-        neighbor_ids = neighbor_mapping[package_id]
-        neighbors.update(pool.id_to_package(d_id) for d_id in neighbor_ids)
+        neighbor_ids.update(neighbor_mapping[package_id])
 
-    return neighbors
+    if transitive:
+        reachable_ids = set()
+        for neighbor_id in neighbor_ids:
+            if neighbor_id not in reachable_ids:
+                connected_nodes(neighbor_id, neighbor_mapping.__getitem__,
+                                reachable_ids)
+        neighbor_ids = reachable_ids
+
+    return set(map(pool.id_to_package, neighbor_ids))
 
 
 def _package_ids_satisfying_requirement(pool, requirement):
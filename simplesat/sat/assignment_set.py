@@ -33,7 +33,7 @@ class AssignmentSet(object):
             self._update_diff(key, value)
             self._data[key] = value
             self._data[-key] = not value
-            self._assigned_ids.add(abs(key))
+            self._assigned_ids.add(abskey)
 
         self._seen.add(abskey)
 
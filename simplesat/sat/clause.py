@@ -2,13 +2,19 @@ from __future__ import absolute_import
 
 from collections import OrderedDict
 
+from six.moves import range
+
 
 class Constraint(object):
-    pass
+    __slots__ = ()
 
 
 class Clause(Constraint):
 
+    # Clauses are created in large numbers and their attributes are read in
+    # the propagation loop, so avoid a per-instance __dict__.
+    __slots__ = ("learned", "rule", "lits")
+
     def __init__(self, lits, learned=False, rule=None):
         """
         Create a new Clause.
@@ -16,7 +22,9 @@ class Clause(Constraint):
         Parameters
         ----------
         lits : list of literals
-            The literals in this clause.
+            The literals in this clause. Once the clause is added to a solver,
+            its two watched literals are always kept at positions 0 and 1;
+            the clause does not store the watch positions separately.
         learned : bool
             A flag indicated whether this clause was learned during solving.
         rule : PackageRule
@@ -49,22 +57,25 @@ class Clause(Constraint):
         # lits. If necessary, this method will re-order some of the literals to
         # keep this assumption.
         lits = self.lits
+        value = assignments.value
         assert -lit in lits[:2]
 
         if lits[0] == -lit:
             lits[0], lits[1] = lits[1], -lit
 
-        if assignments.value(lits[0]) is True:
+        if value(lits[0]) is True:
             # This clause has been satisfied, add it back to the watch list. No
             # unit information can be deduced.
             return None
 
         # Look for another literal to watch, and switch it with lit[1] to keep
-        # the assumption on the watched literals in place.
-        for n, other in enumerate(lits[2:]):
-            if assignments.value(other) is not False:
+        # the assumption on the watched literals in place. Index into lits
+        # directly rather than scanning a copy of its tail.
+        for n in range(2, len(lits)):
+            other = lits[n]
+            if value(other) is not False:
                 # Found a new literal that could serve as a watch.
-                lits[1], lits[n + 2] = other, -lit
+                lits[1], lits[n] = other, -lit
                 return None
 
         # Clause is unit under assignment. Return the literal that can be
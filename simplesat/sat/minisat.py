@@ -5,6 +5,7 @@ A SAT solver which follows the Minisat approach.
 from __future__ import absolute_import
 
 from collections import defaultdict, deque, OrderedDict
+import heapq
 import itertools
 
 from six.moves import range
@@ -262,9 +263,43 @@ class UNSAT(object):
         return '\n'.join(reason) + '\n'
 
 
+class ActivityQueue(object):
+    """A propagation queue which yields the literals whose variables have the
+    highest activity first, and literals of equal activity in the order in
+    which they were added.
+
+    It implements the subset of the deque interface used for
+    `MiniSATSolver.prop_queue`.
+    """
+
+    def __init__(self, activity):
+        self._activity = activity
+        self._heap = []
+        self._counter = itertools.count()
+
+    def append(self, lit):
+        entry = (-self._activity[abs(lit)], next(self._counter), lit)
+        heapq.heappush(self._heap, entry)
+
+    def popleft(self):
+        return heapq.heappop(self._heap)[-1]
+
+    def clear(self):
+        del self._heap[:]
+
+    def __len__(self):
+        return len(self._heap)
+
+
 class MiniSATSolver(object):
+
+    # Factor by which the activity of all variables decays after each
+    # conflict. Rather than decaying every variable, the amount by which
+    # activities are bumped grows by the inverse of this factor.
+    ACTIVITY_DECAY = 0.95
+
     @classmethod
-    def from_rules(cls, rules, policy=None):
+    def from_rules(cls, rules, policy=None, use_vsids=False):
         """
         Construct a SAT solver from a rules generator.
 
@@ -273,21 +308,28 @@ class MiniSATSolver(object):
         rules: RulesGenerator
         policy: IPolicy
             The policy to use for this SAT solver.
+        use_vsids: bool
+            Whether to propagate the literals of the most active variables
+            first. This is only available when constructing the solver
+            directly: DependencySolver always uses the default.
 
         Returns
         -------
         solver: MiniSATSolver.
 
         """
-        solver = cls(policy)
+        solver = cls(policy, use_vsids=use_vsids)
         for rule in rules:
             solver.add_clause(rule.literals, rule=rule)
         solver._setup_assignments()
         return solver
 
-    def __init__(self, policy=None):
+    def __init__(self, policy=None, use_vsids=False):
 
         self.clauses = []
+        # Maps a literal to the (clause, blocker) pairs for the clauses
+        # watching its negation. The blocker is another literal of the clause:
+        # while it is True, the clause is satisfied and need not be visited.
         self.watches = defaultdict(list)
 
         self.assignments = AssignmentSet()
@@ -299,7 +341,19 @@ class MiniSATSolver(object):
         # assignment, or by unit propagation).
         self.levels = defaultdict(int)
 
-        self.prop_queue = deque()
+        # How often each variable took part in recent conflicts. Only tracked
+        # if use_vsids is set: bumped during conflict analysis, with older
+        # bumps counting for progressively less.
+        self.activity = defaultdict(float)
+        self._activity_increment = 1.0
+        self._use_vsids = use_vsids
+
+        # If use_vsids is set, the literals of the most active variables are
+        # propagated first, otherwise in the order in which they are enqueued.
+        if use_vsids:
+            self.prop_queue = ActivityQueue(self.activity)
+        else:
+            self.prop_queue = deque()
 
         # A list of all the decisions that we've made so far.
         self.trail = []
@@ -352,8 +406,8 @@ class MiniSATSolver(object):
                 raise SatisfiabilityError(conflict)
         else:
             p, q = clause[:2]
-            self.watches[-p].append(clause)
-            self.watches[-q].append(clause)
+            self.watches[-p].append((clause, q))
+            self.watches[-q].append((clause, p))
 
         self.clauses.append(clause)
 
@@ -367,28 +421,51 @@ class MiniSATSolver(object):
                 assignments[variable] = None
 
     def propagate(self):
-        while len(self.prop_queue) > 0:
-            lit = self.prop_queue.popleft()
-            clauses = self.watches[lit]
-            self.watches[lit] = []
-
-            while len(clauses) > 0:
-                clause = clauses.pop()
-                unit = clause.rewatch(self.assignments, lit)
+        # Look up the attributes used in the inner loop only once.
+        watches = self.watches
+        prop_queue = self.prop_queue
+        assignments = self.assignments
+        # Both polarities are stored, so the value of a literal is a single
+        # lookup; this is AssignmentSet.value without the method call.
+        value = assignments._data.get
+
+        while prop_queue:
+            lit = prop_queue.popleft()
+            # Take over the whole watch list: entries are only put back if
+            # they still need to watch this literal.
+            entries = watches[lit]
+            watches[lit] = []
+
+            while entries:
+                entry = entries.pop()
+                clause, blocker = entry
+                if value(blocker) is True:
+                    # Satisfied by the blocker, no need to look at the clause.
+                    watches[lit].append(entry)
+                    continue
+
+                if len(clause.lits) == 2:
+                    # Binary clauses watch both of their literals, and their
+                    # blocker is the other one. As it is not True, the clause
+                    # is unit (or conflicting) and keeps its watches.
+                    watches[lit].append(entry)
+                    unit = blocker
+                else:
+                    unit = clause.rewatch(assignments, lit)
 
-                # Re-insert in the appropriate watch list.
-                self.watches[-clause.lits[1]].append(clause)
+                    # Re-insert in the appropriate watch list.
+                    lits = clause.lits
+                    watches[-lits[1]].append((clause, lits[0]))
 
                 # Deal with unit clauses.
                 if unit is not None:
                     # TODO Refactor this to take into account the return value
                     # of enqueue().
-                    if self.assignments.value(unit) is False:
-                        # Conflict. Clear the queue and re-insert the remaining
-                        # unwatched clauses into the watch list.
-                        self.prop_queue.clear()
-                        for remaining in clauses:
-                            self.watches[lit].append(remaining)
+                    if value(unit) is False:
+                        # Conflict. Clear the queue and splice the remaining
+                        # unvisited entries back into the watch list.
+                        prop_queue.clear()
+                        watches[lit].extend(entries)
                         return clause
                     else:
                         # Non-conflicting unit literal.
@@ -478,6 +555,17 @@ class MiniSATSolver(object):
 
         clause_trail = [conflict]
 
+        # The walk below only undoes assignments within the current decision
+        # level, so the level itself and the containers it consults can be
+        # looked up once.
+        decision_level = self.decision_level
+        levels = self.levels
+        trail = self.trail
+        assigning_clauses = self.assigning_clauses
+        use_vsids = self._use_vsids
+        activity = self.activity
+        increment = self._activity_increment
+
         while True:
             reason = conflict.calculate_reason(p)
 
@@ -486,19 +574,22 @@ class MiniSATSolver(object):
                 var = abs(lit)
                 if var not in seen:
                     seen.add(var)
-                    if self.levels[var] == self.decision_level:
+                    if use_vsids:
+                        activity[var] += increment
+                    level = levels[var]
+                    if level == decision_level:
                         # A new literal on the current decision level.
                         counter += 1
                     else:
                         # At this point, we don't treat level 0 as
                         # special. Maybe that's a mistake...
                         learned_lits.append(-lit)
-                        btlevel = max(btlevel, self.levels[var])
+                        btlevel = max(btlevel, level)
 
             # Select next literal to look at.
             while True:
-                p = self.trail[-1]
-                conflict = self.assigning_clauses[abs(p)]
+                p = trail[-1]
+                conflict = assigning_clauses[abs(p)]
                 clause_trail.append(conflict)
                 self.undo_one()
                 if abs(p) in seen:
@@ -511,8 +602,20 @@ class MiniSATSolver(object):
         learned_lits.append(-p)  # At this point p is the UIP.
         learned = Clause(learned_lits, learned=True)
         self.clause_trails[learned] = clause_trail
+        if use_vsids:
+            self._decay_activity()
         return learned, btlevel
 
+    def _decay_activity(self):
+        """Make the bumps of past conflicts count less than future ones.
+        """
+        self._activity_increment /= self.ACTIVITY_DECAY
+        if self._activity_increment > 1e100:
+            # Rescale everything to stay clear of floating point overflow.
+            for var in self.activity:
+                self.activity[var] *= 1e-100
+            self._activity_increment *= 1e-100
+
     def record(self, learned_clause):  # Needs test.
         """Drive the backtracking by adding a learned clause, which is unit by
         assumption.
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import copy
 import unittest
 
 from ..assignment_set import AssignmentSet
@@ -126,6 +127,15 @@ class TestAssignmentSet(unittest.TestCase):
         self.assertIs(AS.value(-2), None)
         self.assertIs(AS.value(2), None)
 
+    def test_value_deepcopy(self):
+        AS = AssignmentSet({1: True})
+
+        copied = copy.deepcopy(AS)
+        copied[1] = False
+
+        self.assertIs(copied.value(1), False)
+        self.assertIs(AS.value(1), True)
+
         AS[1] = None
         self.assertIs(AS.value(-1), None)
         self.assertIs(AS.value(1), None)
@@ -138,6 +148,18 @@ class TestAssignmentSet(unittest.TestCase):
         self.assertIs(AS.value(-3), True)
         self.assertIs(AS.value(3), False)
 
+    def test_value_copy(self):
+        AS = AssignmentSet({1: True, 2: None})
+
+        copied = AS.copy()
+        copied[1] = False
+        copied[2] = True
+
+        self.assertIs(copied.value(1), False)
+        self.assertIs(copied.value(-2), False)
+        self.assertIs(AS.value(1), True)
+        self.assertIs(AS.value(2), None)
+
     def test_getitem(self):
         AS = AssignmentSet()
 
@@ -5,13 +5,18 @@ import six
 
 from ..assignment_set import AssignmentSet
 from ..clause import Clause
-from ..minisat import MiniSATSolver
+from ..minisat import ActivityQueue, MiniSATSolver
 
 
 # TODO: Move all ZM01 related tests to a separate module.
 
 
-def zm01_solver(add_conflict=False):
+def watched_clauses(solver, lit):
+    """Return the clauses in the watch list of `lit`, without blockers."""
+    return [clause for clause, _ in solver.watches[lit]]
+
+
+def zm01_solver(add_conflict=False, use_vsids=False):
     """Create a solver with a non-trivial implication graph.
 
     The system is taken from Figure 2 in "Efficient Conflict Driven Learning in
@@ -19,7 +24,7 @@ def zm01_solver(add_conflict=False):
     (2001).
 
     """
-    s = MiniSATSolver()
+    s = MiniSATSolver(use_vsids=use_vsids)
     s.add_clause(Clause([-12, 6, -11]))
     s.add_clause(Clause([16, -11, 13]))
     s.add_clause(Clause([-2, 12, -16]))
@@ -57,6 +62,20 @@ class TestClause(unittest.TestCase):
         # Then
         self.assertIsNone(unit)
         six.assertCountEqual(self, c.lits, [5, -2, 1])
+        six.assertCountEqual(self, c.lits[:2], [5, -2])
+
+    def test_rewatch_skips_false_literals(self):
+        # Given
+        c = Clause([1, -2, 3, -4, 5])
+        assignments = AssignmentSet(
+            {1: False, 2: None, 3: False, 4: True, 5: None})
+
+        # When
+        unit = c.rewatch(assignments, -1)
+
+        # Then
+        self.assertIsNone(unit)
+        self.assertEqual(c.lits, [-2, 5, 3, -4, 1])
 
     def test_rewatch_true(self):
         # Given
@@ -93,6 +112,29 @@ class TestClause(unittest.TestCase):
         six.assertCountEqual(self, reason, [-1, 2, -5])
 
 
+class TestActivityQueue(unittest.TestCase):
+    def test_order(self):
+        # Given
+        activity = {1: 0.0, 2: 3.0, 3: 1.0, 4: 3.0}
+        queue = ActivityQueue(activity)
+
+        # When
+        for lit in [1, -2, 3, 4]:
+            queue.append(lit)
+
+        # Then
+        self.assertEqual(len(queue), 4)
+        self.assertEqual(queue.popleft(), -2)
+        self.assertEqual(queue.popleft(), 4)
+        self.assertEqual(queue.popleft(), 3)
+
+        # When
+        queue.clear()
+
+        # Then
+        self.assertEqual(len(queue), 0)
+
+
 class TestMiniSATSolver(unittest.TestCase):
 
     @mock.patch.object(MiniSATSolver, 'enqueue')
@@ -138,8 +180,8 @@ class TestMiniSATSolver(unittest.TestCase):
         self.assertEqual(len(s.clauses), 1)
         clause = s.clauses[0]
         self.assertEqual(len(s.watches), 2)
-        six.assertCountEqual(self, s.watches[1], [clause])
-        six.assertCountEqual(self, s.watches[-2], [clause])
+        six.assertCountEqual(self, s.watches[1], [(clause, 2)])
+        six.assertCountEqual(self, s.watches[-2], [(clause, -1)])
 
         self.assertEqual(len(s.clauses), 1)
         self.assertFalse(mock_enqueue.called)
@@ -170,13 +212,14 @@ class TestMiniSATSolver(unittest.TestCase):
 
         # Then
         self._assertWatchesNotTrue(s.watches, s.assignments)
+        self._assertWatchedLiteralsFirst(s.watches)
         self.assertFalse(mock_enqueue.called)
         self.assertIsNone(conflict)
-        six.assertCountEqual(self, s.watches[-7], [cl2])
-        six.assertCountEqual(self, s.watches[-1], [cl1])
-        six.assertCountEqual(self, s.watches[2], [cl3])
-        six.assertCountEqual(self, s.watches[4], [cl2])
-        six.assertCountEqual(self, s.watches[5], [cl1, cl3])
+        six.assertCountEqual(self, watched_clauses(s, -7), [cl2])
+        six.assertCountEqual(self, watched_clauses(s, -1), [cl1])
+        six.assertCountEqual(self, watched_clauses(s, 2), [cl3])
+        six.assertCountEqual(self, watched_clauses(s, 4), [cl2])
+        six.assertCountEqual(self, watched_clauses(s, 5), [cl1, cl3])
 
     @mock.patch.object(MiniSATSolver, 'enqueue')
     def test_propagate_with_unit_info(self, mock_enqueue):
@@ -199,12 +242,36 @@ class TestMiniSATSolver(unittest.TestCase):
 
         # Then
         self._assertWatchesNotTrue(s.watches, s.assignments)
+        self._assertWatchedLiteralsFirst(s.watches)
         self.assertEqual(mock_enqueue.call_count, 1)
         self.assertIsNone(conflict)
-        six.assertCountEqual(self, s.watches[-2], [cl2])
-        six.assertCountEqual(self, s.watches[-1], [cl1])
-        six.assertCountEqual(self, s.watches[4], [cl2])
-        six.assertCountEqual(self, s.watches[5], [cl1])
+        six.assertCountEqual(self, watched_clauses(s, -2), [cl2])
+        six.assertCountEqual(self, watched_clauses(s, -1), [cl1])
+        six.assertCountEqual(self, watched_clauses(s, 4), [cl2])
+        six.assertCountEqual(self, watched_clauses(s, 5), [cl1])
+
+    @mock.patch.object(MiniSATSolver, 'enqueue')
+    def test_propagate_blocker_true(self, mock_enqueue):
+        # A clause whose blocking literal is True is left untouched.
+
+        # Given
+        s = MiniSATSolver()
+        cl1 = Clause([1, 2, 3])
+        s.add_clause(cl1)
+
+        s.assignments = AssignmentSet({1: None, 2: True, 3: None})
+
+        # When
+        s.assignments[1] = False
+        s.prop_queue.append(-1)
+        conflict = s.propagate()
+
+        # Then
+        self.assertIsNone(conflict)
+        self.assertFalse(mock_enqueue.called)
+        self.assertEqual(cl1.lits, [1, 2, 3])
+        six.assertCountEqual(self, s.watches[-1], [(cl1, 2)])
+        six.assertCountEqual(self, s.watches[-2], [(cl1, 1)])
 
     def test_propagate_conflict(self):
         # Make one literal true, and cause a conflict in the unit propagation.
@@ -226,9 +293,10 @@ class TestMiniSATSolver(unittest.TestCase):
         # Then
         self.assertEqual(conflict, cl1)
         # Assert that all clauses are still watched.
-        six.assertCountEqual(self, s.watches[-3], [cl2])
-        six.assertCountEqual(self, s.watches[-2], [cl1])
-        six.assertCountEqual(self, s.watches[1], [cl1, cl2])
+        six.assertCountEqual(self, watched_clauses(s, -3), [cl2])
+        six.assertCountEqual(self, watched_clauses(s, -2), [cl1])
+        six.assertCountEqual(self, watched_clauses(s, 1), [cl1, cl2])
+        self._assertWatchedLiteralsFirst(s.watches)
 
     def test_setup_does_not_overwrite_assignments(self):
         # Given
@@ -243,11 +311,20 @@ class TestMiniSATSolver(unittest.TestCase):
         # Then
         self.assertEqual(s.assignments.items(), expected_assignments)
 
+    def _assertWatchedLiteralsFirst(self, watches):
+        # A clause in the watch list of lit watches -lit, so -lit must be one
+        # of its first two literals.
+        for lit, entries in watches.items():
+            for clause, _ in entries:
+                self.assertIn(-lit, clause.lits[:2])
+
     def _assertWatchesNotTrue(self, watches, assignments):
-        for watch, clauses in watches.items():
-            if len(clauses) > 0:
-                status = assignments[abs(watch)]
-                self.assertIsNot(status, True)
+        # Collect every offending watch in one pass, so that a failure
+        # reports all of them at once.
+        true_watches = sorted(
+            watch for watch, entries in watches.items()
+            if entries and assignments[abs(watch)] is True)
+        self.assertEqual(true_watches, [])
 
     def test_enqueue(self):
         # Given
@@ -281,9 +358,9 @@ class TestMiniSATSolver(unittest.TestCase):
         self.assertEqual(s.assignments.to_dict(),
                          {1: True, 2: False, 3: None, 4: None})
         self.assertEqual(s.trail, [-2, 1])
-        six.assertCountEqual(self, s.watches[-1], [cl1, cl2])
-        six.assertCountEqual(self, s.watches[-2], [cl1])
-        six.assertCountEqual(self, s.watches[-3], [cl2])
+        six.assertCountEqual(self, watched_clauses(s, -1), [cl1, cl2])
+        six.assertCountEqual(self, watched_clauses(s, -2), [cl1])
+        six.assertCountEqual(self, watched_clauses(s, -3), [cl2])
 
     def test_propagation_with_queue_multiple_implications(self):
         # Given
@@ -306,6 +383,27 @@ class TestMiniSATSolver(unittest.TestCase):
                          {1: False, 2: False, 3: False, 4: False})
         self.assertEqual(s.trail, [-1, -2, -3, -4])
 
+    def test_propagation_with_queue_multiple_implications_vsids(self):
+        # Given
+        s = MiniSATSolver(use_vsids=True)
+        cl1 = Clause([1, -2])
+        cl2 = Clause([1,  2, -3])
+        cl3 = Clause([1,  2,  3, -4])
+        s.add_clause(cl1)
+        s.add_clause(cl2)
+        s.add_clause(cl3)
+        s.assignments = AssignmentSet({1: None, 2: None, 3: None, 4: None})
+
+        # When
+        s.enqueue(-1)
+        conflict = s.propagate()
+
+        # Then
+        self.assertIsNone(conflict)
+        self.assertEqual(s.assignments.to_dict(),
+                         {1: False, 2: False, 3: False, 4: False})
+        six.assertCountEqual(self, s.trail, [-1, -2, -3, -4])
+
     def test_propagation_with_queue_conflicted(self):
         # Check that we can recover from a conflict that arises during unit
         # propagation (i.e. leave the watch list in a consistent state, and
@@ -328,11 +426,12 @@ class TestMiniSATSolver(unittest.TestCase):
         # Then
         self.assertIsNotNone(conflict)
         self.assertEqual(s.trail, [-1, -2, 3])
-        six.assertCountEqual(self, s.watches[-3], [cl3])
-        six.assertCountEqual(self, s.watches[-2], [cl2, cl3])
-        six.assertCountEqual(self, s.watches[-1], [cl1])
-        six.assertCountEqual(self, s.watches[2], [cl1])
-        six.assertCountEqual(self, s.watches[3], [cl2])
+        six.assertCountEqual(self, watched_clauses(s, -3), [cl3])
+        six.assertCountEqual(self, watched_clauses(s, -2), [cl2, cl3])
+        six.assertCountEqual(self, watched_clauses(s, -1), [cl1])
+        six.assertCountEqual(self, watched_clauses(s, 2), [cl1])
+        six.assertCountEqual(self, watched_clauses(s, 3), [cl2])
+        self._assertWatchedLiteralsFirst(s.watches)
 
     def test_propagate_zm01(self):
         # Test that the solver can replicate the implication graph of ZM01. For
@@ -454,6 +553,7 @@ class TestMiniSATSolver(unittest.TestCase):
         for lit, clauses in s.watches.items():
             if len(clauses) > 2:
                 self.assertNotEqual(s.assignments.value(-lit), False)
+        self._assertWatchedLiteralsFirst(s.watches)
 
     def test_analyze_same_level(self):
         # Given
@@ -499,6 +599,34 @@ class TestMiniSATSolver(unittest.TestCase):
         six.assertCountEqual(self, learned_clause.lits, [-8, 10, 17, -19])
         self.assertEqual(bt_level, 3)
 
+    def test_analyze_bumps_activity(self):
+        # Given
+        s = zm01_solver(add_conflict=True, use_vsids=True)
+        s.assume(11)
+        conflict = s.propagate()
+
+        # When
+        learned_clause, _ = s.analyze(conflict)
+
+        # Then
+        for lit in learned_clause.lits:
+            self.assertEqual(s.activity[abs(lit)], 1.0)
+        self.assertEqual(s.activity[6], 0.0)
+        self.assertGreater(s._activity_increment, 1.0)
+
+    def test_analyze_without_vsids_leaves_activity(self):
+        # Given
+        s = zm01_solver(add_conflict=True)
+        s.assume(11)
+        conflict = s.propagate()
+
+        # When
+        s.analyze(conflict)
+
+        # Then
+        self.assertEqual(s.activity, {})
+        self.assertEqual(s._activity_increment, 1.0)
+
     def test_record_learned_clause(self):
         # Given
         s = MiniSATSolver()
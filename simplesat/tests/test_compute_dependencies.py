@@ -24,6 +24,12 @@ PACKAGE_DEF_1 = dedent("""\
     E 1.0.1-1
 """)
 
+PACKAGE_DEF_CYCLE = dedent("""\
+    F 0.0.0-1; depends (G ^= 0.0.0)
+    G 0.0.0-1; depends (H ^= 0.0.0)
+    H 0.0.0-1; depends (G ^= 0.0.0)
+""")
+
 PACKAGE_DEF_2 = dedent("""\
     B 0.0.0-1; depends (D == 0.0.0-2)
     C 0.0.0-1; depends (E >= 1.0.0)
@@ -73,6 +79,17 @@ class TestComputeDependencies(unittest.TestCase):
         deps = compute_dependencies(self.repos, requirement, transitive=True)
         self.assertEqual(deps, set(expected_deps))
 
+    def test_cyclic_requirements_transitive(self):
+        repos = [Repository(packages_from_definition(PACKAGE_DEF_CYCLE))]
+        requirement = InstallRequirement._from_string('F ^= 0.0.0')
+        expected_deps = packages_from_definition(
+            """G 0.0.0-1; depends (H ^= 0.0.0)
+            H 0.0.0-1; depends (G ^= 0.0.0)"""
+        )
+
+        deps = compute_dependencies(repos, requirement, transitive=True)
+        self.assertEqual(deps, set(expected_deps))
+
 
 class TestComputeReverseDependencies(unittest.TestCase):
 
@@ -116,6 +133,19 @@ class TestComputeReverseDependencies(unittest.TestCase):
                                             transitive=True)
         self.assertEqual(deps, set(expected_deps))
 
+    def test_cyclic_dependencies_transitive(self):
+        repos = [Repository(packages_from_definition(PACKAGE_DEF_CYCLE))]
+        requirement = InstallRequirement._from_string('H ^= 0.0.0')
+        expected_deps = packages_from_definition(
+            """F 0.0.0-1; depends (G ^= 0.0.0)
+            G 0.0.0-1; depends (H ^= 0.0.0)
+            H 0.0.0-1; depends (G ^= 0.0.0)"""
+        )
+
+        deps = compute_reverse_dependencies(repos, requirement,
+                                            transitive=True)
+        self.assertEqual(deps, set(expected_deps))
+
 
 class TestComputeLeafPackages(unittest.TestCase):
 
@@ -3,7 +3,7 @@
 
 from __future__ import division, print_function
 
-from collections import defaultdict, deque
+from collections import deque
 
 import six
 import itertools
@@ -127,25 +127,101 @@ def package_lit_dependency_graph(pool, package_lits, closed=True):
     return dict(nodes_to_edges)
 
 
+def reverse_graph(nodes_to_edges):
+    """ Return the nodes_to_edges adjacency dict with every edge reversed.
+    Every node of the original graph is a key of the result.
+    """
+    # Accumulate into lists, which are cheaper to append to than sets are to
+    # add to, and convert once at the end.
+    sources = {node: [] for node in nodes_to_edges}
+    for node, neighbors in six.iteritems(nodes_to_edges):
+        for neighbor in neighbors:
+            try:
+                sources[neighbor].append(node)
+            except KeyError:
+                sources[neighbor] = [node]
+    return {node: set(nodes) for node, nodes in six.iteritems(sources)}
+
+
 def transitive_neighbors(nodes_to_edges):
     """ Return the set of all reachable nodes for each node in the
-    nodes_to_edges adjacency dict. """
-    trans = defaultdict(set)
-    for node in nodes_to_edges.keys():
-        _transitive(node, nodes_to_edges, trans)
-    return dict(trans)
-
-
-def _transitive(node, nodes_to_edges, trans):
-    trans = trans if trans is not None else defaultdict(set)
-    if node in trans:
-        return trans
-    neighbors = nodes_to_edges[node]
-    trans[node].update(neighbors)
-    for neighbor in neighbors:
-        _transitive(neighbor, nodes_to_edges, trans)
-        trans[node].update(trans[neighbor])
-    return trans
+    nodes_to_edges adjacency dict.
+
+    The graph is condensed into its strongly connected components, whose
+    closures are computed once, in reverse topological order, and shared by
+    every member of the component. A node is only part of its own closure if
+    it lies on a cycle.
+    """
+    closures = {}
+    for component in _strongly_connected_components(nodes_to_edges):
+        members = set(component)
+        reachable = set()
+        is_cyclic = len(component) > 1
+        for node in component:
+            for neighbor in nodes_to_edges.get(node, ()):
+                if neighbor in members:
+                    is_cyclic = True
+                else:
+                    # Components are yielded sinks first, so the closure of
+                    # every neighbor outside this component is already known.
+                    reachable.add(neighbor)
+                    reachable.update(closures[neighbor])
+        if is_cyclic:
+            reachable.update(members)
+        closure = frozenset(reachable)
+        for node in component:
+            closures[node] = closure
+    return closures
+
+
+def _strongly_connected_components(nodes_to_edges):
+    """ Yield the strongly connected components of a graph as lists of nodes.
+
+    This is Tarjan's algorithm, using an explicit stack rather than recursion
+    so that long dependency chains do not hit the recursion limit. Components
+    are yielded in reverse topological order: every component reachable from
+    a given component is yielded before it.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    counter = itertools.count()
+
+    for root in nodes_to_edges:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = next(counter)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(nodes_to_edges.get(root, ())))]
+        while work:
+            node, neighbors = work[-1]
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = next(counter)
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append(
+                        (neighbor, iter(nodes_to_edges.get(neighbor, ()))))
+                    break
+                elif neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            else:
+                # All neighbors of `node` have been visited.
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
 
 
 def connected_nodes(node, neighbor_func, visited=None):
@@ -3,13 +3,14 @@
 
 from __future__ import division, print_function
 
+import sys
 import unittest
 from textwrap import dedent
 
 from simplesat.test_utils import pool_and_repository_from_packages
 
 from ..graph import (
-    package_lit_dependency_graph, toposort, transitive_neighbors
+    package_lit_dependency_graph, reverse_graph, toposort, transitive_neighbors
 )
 
 
@@ -62,6 +63,74 @@ class TestGraph(unittest.TestCase):
         # Then
         self.assertEqual(result, expected)
 
+    def test_transitive_neighbors_cycles(self):
+        # Given
+        graph = {
+            0: {1},
+            1: {2},
+            2: {0, 3},
+            3: {4},
+            4: {3},
+            5: {0},
+            6: {6, 5},
+        }
+
+        expected = {
+            0: {0, 1, 2, 3, 4},
+            1: {0, 1, 2, 3, 4},
+            2: {0, 1, 2, 3, 4},
+            3: {3, 4},
+            4: {3, 4},
+            5: {0, 1, 2, 3, 4},
+            6: {0, 1, 2, 3, 4, 5, 6},
+        }
+
+        # When
+        result = transitive_neighbors(graph)
+
+        # Then
+        self.assertEqual(result, expected)
+        # Members of a strongly connected component share their closure
+        self.assertIs(result[0], result[2])
+        self.assertIs(result[3], result[4])
+
+    def test_reverse_graph(self):
+        # Given
+        graph = {
+            0: {1, 2},
+            1: {2},
+            2: set(),
+            3: {3},
+        }
+
+        expected = {
+            0: set(),
+            1: {0},
+            2: {0, 1},
+            3: {3},
+        }
+
+        # When
+        result = reverse_graph(graph)
+
+        # Then
+        self.assertEqual(result, expected)
+
+    def test_transitive_neighbors_long_chain(self):
+        # Given
+        # A dependency chain deeper than the recursion limit, closed into a
+        # cycle at the end.
+        n = sys.getrecursionlimit() + 100
+        graph = {i: {i + 1} for i in range(n)}
+        graph[n] = {n - 1}
+
+        # When
+        result = transitive_neighbors(graph)
+
+        # Then
+        self.assertEqual(result[0], set(range(1, n + 1)))
+        self.assertEqual(result[n], {n - 1, n})
+
     def test_toposort(self):
         # Given
         graph = {